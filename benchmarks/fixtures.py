@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import random
+from xml.sax.saxutils import escape
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+ZOTERO_SEED = os.path.join(REPO_ROOT, "zotero_cache.json")
+
+# 合成库里约 15% 的条目是附件 / 笔记等，用来覆盖 ZoteroSync 的过滤逻辑
+JUNK_TYPES = ["attachment", "note", "webpage"]
+PAPER_TYPES = ["preprint", "journalArticle", "conferencePaper", "thesis", "report"]
+
+def _load(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _rng(*parts):
+    """按参数派生确定性的随机数生成器，同一输入总是得到同一份数据"""
+    digest = hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+class FixtureFactory:
+    """基于录制样本 (fixtures/ 与仓库自带的 zotero_cache.json) 合成任意规模的响应"""
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        with open(ZOTERO_SEED, 'r', encoding='utf-8') as f:
+            self.zotero_seed = json.load(f)
+        self.vocab = sorted({w for item in self.zotero_seed
+                             for w in item['data'].get('title', '').split() if len(w) > 2})
+        self.abstracts = [item['data'].get('abstractNote', '') for item in self.zotero_seed]
+        self.s2_template = json.loads(_load("s2_paper.json"))
+        self.arxiv_feed = _load("arxiv_feed.xml")
+        self.arxiv_entry = _load("arxiv_entry.xml")
+        self.openai_chat = _load("openai_chat.json").encode('utf-8')
+
+    # --- Zotero ---
+    def zotero_item(self, index: int):
+        rng = _rng(self.seed, "zotero", index)
+        base = self.zotero_seed[index % len(self.zotero_seed)]
+        key = f"B{index:07d}"
+        data = dict(base['data'])
+        data['key'] = key
+        data['title'] = " ".join(rng.sample(self.vocab, rng.randint(4, 10)))
+        data['itemType'] = rng.choice(JUNK_TYPES) if rng.random() < 0.15 else rng.choice(PAPER_TYPES)
+        item = dict(base)
+        item['key'] = key
+        item['data'] = data
+        return item
+
+    def zotero_library(self, size: int):
+        return [self.zotero_item(i) for i in range(size)]
+
+    def zotero_page(self, size: int, start: int, limit: int):
+        return [self.zotero_item(i) for i in range(start, min(start + limit, size))]
+
+    # --- arXiv ---
+    def arxiv_page(self, start: int, per_page: int, total=500):
+        entries = []
+        for i in range(start, min(start + per_page, total)):
+            rng = _rng(self.seed, "arxiv", i)
+            entries.append(self.arxiv_entry.format(
+                arxiv_id=f"2503.{10000 + i:05d}",
+                published=f"2025-03-{1 + i % 28:02d}",
+                title=escape(" ".join(rng.sample(self.vocab, rng.randint(5, 12)))),
+                summary=escape(rng.choice(self.abstracts))
+            ))
+        return self.arxiv_feed.format(total=total, start=start, per_page=per_page,
+                                      entries="".join(entries)).encode('utf-8')
+
+    # --- Semantic Scholar ---
+    def s2_paper(self, paper_id: str, n_refs: int, n_cits: int, pool_size=None):
+        """一篇论文及其引用 / 被引列表；邻居 id 取自共享池，多篇论文之间会有重叠边"""
+        rng = _rng(self.seed, "s2", paper_id)
+        pool_size = pool_size or max(4 * (n_refs + n_cits), 100)
+
+        def neighbor(j):
+            return {"paperId": f"P{j:08d}", "title": " ".join(rng.sample(self.vocab, 6)),
+                    "citationCount": rng.randint(0, 5000)}
+
+        ids = rng.sample(range(pool_size), min(n_refs + n_cits, pool_size))
+        paper = dict(self.s2_template)
+        paper.update({
+            "paperId": paper_id,
+            "title": " ".join(rng.sample(self.vocab, 8)),
+            "references": [neighbor(j) for j in ids[:n_refs]],
+            "citations": [neighbor(j) for j in ids[n_refs:]]
+        })
+        return paper
+
+    # --- PDF / LLM ---
+    def pdf_bytes(self, kb: int):
+        return b"%PDF-1.4\n" + b"0" * (kb * 1024) + b"\n%%EOF\n"
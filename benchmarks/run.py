@@ -0,0 +1,294 @@
+"""离线基准测试
+
+用法 (在仓库根目录):
+    python -m benchmarks.run                              # 全部场景，结果 JSON 输出到 stdout
+    python -m benchmarks.run --scenarios fetch_all,build_graph --sizes 1000 --output bench.json
+    python -m benchmarks.run --latency-ms 50 --rate-limit 0.05 --baseline bench.json
+
+每个场景都有期望结果 (条目数 / 节点数 / 下载数等)，不符时标记为 failed，退出码为 1，
+避免 429 等导致的提前返回被误当成“变快”。
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fixtures import REPO_ROOT, FixtureFactory
+from benchmarks.stub_server import StubServer
+
+SCENARIOS = ["fetch_all", "fetch_all_cached", "extract_keywords", "recommend_papers",
+             "build_graph", "build_graph_warm", "render_graph", "pdf_download", "llm_analyze"]
+
+class BenchContext:
+    """在临时工作目录里初始化各引擎，并把所有上游地址指向本地回放服务器"""
+
+    def __init__(self, stub, workdir, args):
+        self.stub = stub
+        self.workdir = workdir
+        self.args = args
+        # 与回放服务器 (子进程) 使用同一个 seed，生成的合成库完全一致
+        self.factory = FixtureFactory(args.seed)
+        self._libraries = {}
+
+        # main.cm 在导入时读取 ./config.yaml，切到临时目录后再导入，避免读到用户配置
+        os.chdir(workdir)
+        if REPO_ROOT not in sys.path: sys.path.insert(0, REPO_ROOT)
+        import arxiv
+        from main import cm
+        cm.config.update({
+            "ZOTERO_API_KEY": "bench",
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"{stub.url}/openai/v1",
+            "PDF_CACHE_DIR": os.path.join(workdir, "pdf_cache"),
+            "GRAPH_DB_PATH": os.path.join(workdir, "graph_store.db")
+        })
+        arxiv.Client.query_url_format = f"{stub.url}/arxiv/api/query?{{}}"
+        self.cm = cm
+
+    def library(self, size):
+        if size not in self._libraries:
+            self._libraries[size] = self.factory.zotero_library(size)
+        return self._libraries[size]
+
+    def valid_library(self, size):
+        """合成库中能通过 ZoteroSync 过滤的条目，即 fetch_all 的期望结果"""
+        z = self.zotero(size)
+        return [i for i in self.library(size) if z._is_valid_paper(i)]
+
+    def zotero(self, size):
+        from zotero_sync import ZoteroSync
+        self.cm.config["ZOTERO_LIB_ID"] = str(size)
+        z = ZoteroSync()
+        z.zot.endpoint = self.stub.url
+        z.cache_file = os.path.join(self.workdir, f"zotero_cache_{size}.json")
+        z.page_delay = self.args.page_delay
+        return z
+
+    def graph_engine(self, fresh=False):
+        from graph_engine import GraphEngine
+        db = self.cm.config["GRAPH_DB_PATH"]
+        if fresh:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db + suffix): os.remove(db + suffix)
+        engine = GraphEngine()
+        engine.S2_API = f"{self.stub.url}/s2/graph/v1"
+        return engine
+
+    def pdf_manager(self, fresh=False):
+        from pdf_manager import PDFManager
+        cache_dir = self.cm.config["PDF_CACHE_DIR"]
+        if fresh and os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+        pdf = PDFManager()
+        pdf.ARXIV_PDF_URL = f"{self.stub.url}/pdf"
+        return pdf
+
+# --- 场景：prepare 在计时之外执行，返回 (被计时的 callable, 期望结果) ---
+def scenario_fetch_all(ctx, size):
+    z = ctx.zotero(size)
+    return lambda: {"items": len(z.fetch_all(force_refresh=True))}, {"items": len(ctx.valid_library(size))}
+
+def scenario_fetch_all_cached(ctx, size):
+    z = ctx.zotero(size)
+    valid = ctx.valid_library(size)
+    with open(z.cache_file, 'w', encoding='utf-8') as f:
+        json.dump(valid, f, ensure_ascii=False)
+    return lambda: {"items": len(z.fetch_all(force_refresh=False))}, {"items": len(valid)}
+
+def scenario_extract_keywords(ctx, size):
+    from main import ArxivRadar
+    radar, items = ArxivRadar(), ctx.library(size)
+    def run():
+        keywords = radar._extract_keywords(items)
+        return {"keywords": len(keywords), "top": keywords}
+    return run, {"keywords": 5}
+
+def scenario_recommend_papers(ctx, size):
+    from main import ArxivRadar
+    radar, items = ArxivRadar(), ctx.library(size)
+    n = ctx.args.arxiv_results
+    return lambda: {"results": len(radar.recommend_papers(items, max_results=n))}, {"results": min(n, 500)}
+
+def _graph_expected(size):
+    return {"nodes": 2 * size + 1, "edges": 2 * size}
+
+def scenario_build_graph(ctx, size):
+    engine = ctx.graph_engine(fresh=True)
+    def run():
+        G, _ = engine.build_graph("BENCHROOT", limit=size)
+        return {"nodes": G.number_of_nodes(), "edges": G.number_of_edges()}
+    return run, _graph_expected(size)
+
+def scenario_build_graph_warm(ctx, size):
+    engine = ctx.graph_engine(fresh=True)
+    engine.build_graph("BENCHROOT", limit=size)
+    def run():
+        G, _ = engine.build_graph("BENCHROOT", limit=size)
+        return {"nodes": G.number_of_nodes(), "edges": G.number_of_edges()}
+    return run, _graph_expected(size)
+
+def scenario_render_graph(ctx, size):
+    from graph_render import _LAYOUT_CACHE, render_graph_html
+    engine = ctx.graph_engine(fresh=True)
+    G, _ = engine.build_graph("BENCHROOT", limit=size)
+    _LAYOUT_CACHE.clear()
+    def run():
+        html = render_graph_html(G)
+        return {"nodes": G.number_of_nodes(), "rendered": "</body>" in html, "html_bytes": len(html)}
+    return run, {"nodes": 2 * size + 1, "rendered": True}
+
+def scenario_pdf_download(ctx, size):
+    pdf = ctx.pdf_manager(fresh=True)
+    ids = [f"2503.{20000 + i:05d}" for i in range(size)]
+    return lambda: {"downloaded": sum(1 for aid in ids if pdf.get_pdf_path(aid))}, {"downloaded": size}
+
+def scenario_llm_analyze(ctx, size):
+    engine = ctx.graph_engine(fresh=True)
+    G, known = engine.build_graph("BENCHROOT", limit=size)
+    # openai SDK 在首次调用时才导入，先不计时地调用一次，避免导入耗时计入第一轮
+    engine.analyze_recommendations(G, known)
+    # fixtures/openai_chat.json 里只有一个分组
+    return lambda: {"groups": len(engine.analyze_recommendations(G, known).get("groups", []))}, {"groups": 1}
+
+# 每个场景的规模参数含义：库条目数 / 图谱每侧节点数 / PDF 篇数
+SCENARIO_SIZES = {
+    "fetch_all": "sizes", "fetch_all_cached": "sizes", "extract_keywords": "sizes",
+    "recommend_papers": "sizes", "build_graph": "graph_sizes", "build_graph_warm": "graph_sizes",
+    "render_graph": "graph_sizes", "pdf_download": "pdf_counts", "llm_analyze": "graph_sizes"
+}
+
+def measure(ctx, name, size, repeat):
+    scenario = globals()[f"scenario_{name}"]
+    walls, mismatch, extra, requests, expected = [], {}, {}, {}, {}
+    for _ in range(repeat):
+        run, expected = scenario(ctx, size)
+        ctx.stub.reset_counters()
+        t0 = time.perf_counter()
+        extra = run()
+        walls.append(time.perf_counter() - t0)
+        requests = ctx.stub.snapshot()
+        mismatch.update({k: {"expected": v, "actual": extra.get(k)}
+                         for k, v in expected.items() if extra.get(k) != v})
+
+    # 内存峰值单独再跑一遍：tracemalloc 会明显拖慢被测代码，不能和计时放在同一遍
+    run, _ = scenario(ctx, size)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "size": size,
+        "status": "failed" if mismatch else "ok",
+        "expected": expected,
+        "mismatch": mismatch,
+        "wall_s": round(statistics.median(walls), 4),
+        "wall_s_all": [round(w, 4) for w in walls],
+        "peak_mem_mb": round(peak / 2**20, 2),
+        "requests": sum(r["requests"] for r in requests.values()),
+        "rate_limited": sum(r["rate_limited"] for r in requests.values()),
+        "bytes": sum(r["bytes"] for r in requests.values()),
+        "by_upstream": requests,
+        "result": extra
+    }
+
+def compare(results, baseline_path, threshold):
+    """与基线结果对比，返回 wall time 变慢超过 threshold 的场景 (失败的场景不参与比较)"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["scenario"], r["size"]))
+        if r["status"] != "ok" or (old and old.get("status", "ok") != "ok"): continue
+        if old and old["wall_s"] > 0 and r["wall_s"] > old["wall_s"] * (1 + threshold):
+            regressions.append({"scenario": r["scenario"], "size": r["size"],
+                                "baseline_s": old["wall_s"], "current_s": r["wall_s"],
+                                "ratio": round(r["wall_s"] / old["wall_s"], 2)})
+    return regressions
+
+def _int_list(s):
+    return [int(x) for x in s.split(",") if x]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a local replay server")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000, 50000], help="Zotero 合成库规模")
+    parser.add_argument("--graph-sizes", type=_int_list, default=[500, 2500], help="图谱 references/citations 各自的数量")
+    parser.add_argument("--pdf-counts", type=_int_list, default=[10])
+    parser.add_argument("--pdf-kb", type=int, default=2048)
+    parser.add_argument("--arxiv-results", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个上游请求注入的延迟")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="上游返回 429 的概率")
+    parser.add_argument("--page-delay", type=float, default=0.0, help="ZoteroSync 分页间隔 (线上默认 0.5s)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 文件 (默认 stdout)")
+    parser.add_argument("--baseline", help="基线结果 JSON，有回归时退出码为 1")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定回归的相对变慢比例")
+    args = parser.parse_args(argv)
+
+    names = [s for s in args.scenarios.split(",") if s]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown: parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="ra-bench-")
+    stub = StubServer(latency_ms=args.latency_ms, rate_limit=args.rate_limit,
+                      pdf_kb=args.pdf_kb, seed=args.seed).start()
+    results = []
+    try:
+        # 引擎自身的 print 全部转到 stderr，stdout 只留给 JSON 报告
+        with contextlib.redirect_stdout(sys.stderr):
+            ctx = BenchContext(stub, workdir, args)
+            for name in names:
+                for size in getattr(args, SCENARIO_SIZES[name]):
+                    if SCENARIO_SIZES[name] == "graph_sizes":
+                        stub.configure(graph_size=[size, size])
+                    print(f"⏱️ {name} (size={size}) ...")
+                    r = measure(ctx, name, size, args.repeat)
+                    results.append(r)
+                    print(f"   [{r['status']}] {r['wall_s']}s, {r['requests']} requests, "
+                          f"{r['rate_limited']} rate-limited, {r['peak_mem_mb']} MB peak")
+                    if r["mismatch"]: print(f"   ❌ unexpected result: {r['mismatch']}")
+    finally:
+        stub.stop()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_ms": args.latency_ms,
+            "rate_limit": args.rate_limit,
+            "page_delay": args.page_delay,
+            "repeat": args.repeat,
+            "seed": args.seed
+        },
+        "results": results,
+        "failed": [f"{r['scenario']}:{r['size']}" for r in results if r["status"] != "ok"]
+    }
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+    if args.baseline: report["regressions"] = regressions
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 1 if regressions or report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
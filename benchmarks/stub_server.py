@@ -0,0 +1,176 @@
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class _StubState:
+    """回放服务器在子进程内的状态：路由、注入的延迟 / 429 以及按上游统计的计数器"""
+
+    def __init__(self, latency_ms=0, rate_limit=0.0, graph_size=(500, 500), pdf_kb=2048, seed=0):
+        from benchmarks.fixtures import FixtureFactory
+        self.factory = FixtureFactory(seed)
+        self.latency_ms = latency_ms
+        self.rate_limit = rate_limit
+        self.graph_size = tuple(graph_size)
+        self.pdf_kb = pdf_kb
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = defaultdict(lambda: {"requests": 0, "rate_limited": 0, "bytes": 0})
+
+    def handle(self, req, body=b""):
+        parsed = urlparse(req.path)
+        if parsed.path.startswith("/_stub/"):
+            return self._control(req, parsed.path, body)
+
+        route = parsed.path.strip("/").split("/")[0]
+        if route == "users": route = "zotero"
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        with self._lock:
+            limited = self.rate_limit and self._rng.random() < self.rate_limit
+            self.counters[route]["requests"] += 1
+            if limited: self.counters[route]["rate_limited"] += 1
+
+        if limited:
+            return self._send(req, route, 429, b'{"message": "Too Many Requests"}',
+                              "application/json", {"Retry-After": "1"})
+
+        try:
+            status, payload, ctype, headers = self._dispatch(route, parsed.path, params)
+        except Exception as e:
+            status, payload, ctype, headers = 500, json.dumps({"error": str(e)}).encode(), "application/json", {}
+        self._send(req, route, status, payload, ctype, headers)
+
+    def _control(self, req, path, body):
+        """/_stub/stats, /_stub/reset, /_stub/config：供基准进程读取计数器、调整参数，本身不计数"""
+        with self._lock:
+            if path == "/_stub/reset":
+                self.counters.clear()
+            elif path == "/_stub/config":
+                for k, v in json.loads(body or b"{}").items():
+                    setattr(self, k, tuple(v) if k == "graph_size" else v)
+            payload = json.dumps({k: dict(v) for k, v in self.counters.items()}).encode()
+        self._send(req, None, 200, payload, "application/json", {})
+
+    def _dispatch(self, route, path, params):
+        f = self.factory
+        if route == "zotero":
+            # /users/<库大小>/items —— 用库 ID 直接表示合成库的条目数
+            m = re.match(r"^/users/(\d+)/items", path)
+            if not m: return 404, b"[]", "application/json", {}
+            size = int(m.group(1))
+            page = f.zotero_page(size, int(params.get("start", 0)), int(params.get("limit", 100)))
+            return 200, json.dumps(page).encode(), "application/json", {"Total-Results": str(size)}
+
+        if route == "arxiv":
+            body = f.arxiv_page(int(params.get("start", 0)), int(params.get("max_results", 100)))
+            return 200, body, "application/atom+xml", {}
+
+        if route == "s2":
+            if path.endswith("/paper/search"):
+                paper = f.s2_paper("search-" + params.get("query", ""), 0, 0)
+                paper.pop("references"); paper.pop("citations")
+                return 200, json.dumps({"total": 1, "data": [paper]}).encode(), "application/json", {}
+            paper_id = path.rsplit("/", 1)[-1]
+            n_refs, n_cits = self.graph_size
+            return 200, json.dumps(f.s2_paper(paper_id, n_refs, n_cits)).encode(), "application/json", {}
+
+        if route == "openai":
+            return 200, f.openai_chat, "application/json", {}
+
+        if route == "pdf":
+            return 200, f.pdf_bytes(self.pdf_kb), "application/pdf", {}
+
+        return 404, b"", "text/plain", {}
+
+    def _send(self, req, route, status, body, ctype, headers):
+        req.send_response(status)
+        req.send_header("Content-Type", ctype)
+        req.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            req.send_header(k, v)
+        req.end_headers()
+        req.wfile.write(body)
+        if route:
+            with self._lock:
+                self.counters[route]["bytes"] += len(body)
+
+def _serve(conn, config):
+    """子进程入口：绑定随机端口，把端口号回传给父进程后开始服务"""
+    state = _StubState(**config)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            state.handle(self)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            state.handle(self, self.rfile.read(length) if length else b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    conn.send(server.server_address[1])
+    conn.close()
+    server.serve_forever()
+
+class StubServer:
+    """本地回放服务器：模拟 Zotero / arXiv / Semantic Scholar / OpenAI / arXiv PDF
+
+    在独立子进程中运行，响应的生成不占用被测进程的 GIL，也不计入其内存峰值。
+    路由前缀：/users (Zotero，pyzotero 会丢弃 endpoint 的路径部分), /arxiv, /s2, /openai, /pdf。
+    latency_ms 为每个请求注入的延迟，rate_limit 为返回 429 的概率。
+    """
+
+    def __init__(self, latency_ms=0, rate_limit=0.0, graph_size=(500, 500), pdf_kb=2048, seed=0):
+        self.config = {"latency_ms": latency_ms, "rate_limit": rate_limit, "graph_size": list(graph_size),
+                       "pdf_kb": pdf_kb, "seed": seed}
+        self._proc = None
+        self._port = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._port}"
+
+    def start(self, timeout=30):
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        self._proc = ctx.Process(target=_serve, args=(child_conn, self.config), daemon=True)
+        self._proc.start()
+        if not parent_conn.poll(timeout):
+            self.stop()
+            raise RuntimeError("stub server did not start")
+        self._port = parent_conn.recv()
+        return self
+
+    def stop(self):
+        if self._proc and self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join(5)
+
+    def _control(self, action, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        with urllib.request.urlopen(urllib.request.Request(f"{self.url}/_stub/{action}", data=data), timeout=10) as r:
+            return json.loads(r.read())
+
+    def reset_counters(self):
+        self._control("reset", {})
+
+    def snapshot(self):
+        return self._control("stats")
+
+    def configure(self, **kwargs):
+        self._control("config", kwargs)
@@ -0,0 +1,221 @@
+"""命令行 / 批处理入口 (无需 Streamlit)
+
+    python cli.py sync [--force]
+    python cli.py radar [--max-results 20]
+    python cli.py graph 2310.12345 "Attention Is All You Need" [--input ids.txt] [--analyze]
+    python cli.py fetch-pdfs --input arxiv_ids.txt --workers 8
+    python cli.py ask 2310.12345 --questions questions.txt
+
+结果以 JSONL 逐行写到 stdout，引擎日志走 stderr。重量级依赖 (openai / genai / networkx 等)
+只在用到它们的子命令里才导入。
+"""
+import argparse
+import contextlib
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+class JsonlWriter:
+    """线程安全的 JSONL 输出，逐行 flush 以便下游流式消费"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if record.get("error"): self.errors += 1
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+def _read_lines(f):
+    return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def read_inputs(args):
+    """合并位置参数与 --input 文件 (每行一个，# 开头为注释，- 表示 stdin)"""
+    inputs = list(getattr(args, "ids", None) or [])
+    if getattr(args, "input", None):
+        if args.input == "-":
+            inputs += _read_lines(sys.stdin)
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                inputs += _read_lines(f)
+    return inputs
+
+def run_pool(func, inputs, out, workers):
+    """用线程池处理一批输入，完成一个输出一个 (不保证输入顺序，记录里带 input)；单条失败不影响其它"""
+    def task(item):
+        try:
+            return func(item)
+        except Exception as e:
+            return {"input": item, "error": f"{type(e).__name__}: {e}"}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(task, item) for item in inputs]
+        for future in as_completed(futures):
+            out.write(future.result())
+
+# --- 子命令 ---
+def _zotero_or_error(out):
+    from zotero_sync import ZoteroSync
+    z = ZoteroSync()
+    if not z.zot:
+        out.write({"error": "Zotero client not initialized (check ZOTERO_LIB_ID / ZOTERO_API_KEY)"})
+        return None
+    return z
+
+def cmd_sync(args, out):
+    z = _zotero_or_error(out)
+    if not z: return
+    items = z.fetch_all(force_refresh=args.force)
+    for item in items:
+        if args.raw:
+            out.write(item)
+            continue
+        d = item.get('data', {})
+        out.write({"key": item.get('key'), "title": d.get('title'), "itemType": d.get('itemType'),
+                   "date": d.get('date'), "url": d.get('url'), "DOI": d.get('DOI')})
+
+def cmd_radar(args, out):
+    from main import ArxivRadar
+    z = _zotero_or_error(out)
+    if not z: return
+    items = z.fetch_all(force_refresh=False)
+    for rec in ArxivRadar().recommend_papers(items, max_results=args.max_results):
+        out.write(rec)
+
+def cmd_graph(args, out):
+    from graph_engine import GraphEngine
+    engine = GraphEngine()
+
+    def build(query):
+        # 40 位十六进制是 S2 paperId，其余 (ArXiv ID / 标题) 先解析元数据
+        if re.match(r'^[0-9a-f]{40}$', query):
+            paper_id, title = query, None
+        else:
+            meta = engine.get_paper_metadata(query)
+            if not meta: return {"input": query, "error": "paper not found"}
+            paper_id, title = meta['paperId'], meta.get('title')
+
+        G, known = engine.build_graph(paper_id, limit=args.limit, force_refresh=args.refresh)
+        # build_graph 出错时吞掉异常并返回空图
+        if not known: return {"input": query, "paperId": paper_id, "error": "graph fetch failed"}
+        record = {
+            "input": query,
+            "paperId": paper_id,
+            "title": title or known.get(paper_id, {}).get('label'),
+            "nodes": list(known.values()),
+            "edges": [list(e) for e in G.edges()]
+        }
+        if args.analyze:
+            recs = engine.analyze_recommendations(G, known)
+            if "error" in recs: record["error"] = f"analysis failed: {recs['error']}"
+            record["recommendations"] = recs
+        return record
+
+    run_pool(build, read_inputs(args), out, args.workers)
+
+def cmd_fetch_pdfs(args, out):
+    from pdf_manager import PDFManager
+    pdf = PDFManager()
+
+    def fetch(arxiv_id):
+        path = pdf.get_pdf_path(arxiv_id)
+        return {"input": arxiv_id, "path": path} if path else {"input": arxiv_id, "error": "download failed"}
+
+    run_pool(fetch, read_inputs(args), out, args.workers)
+
+def cmd_ask(args, out):
+    from pdf_manager import PDFManager
+    from gemini_client import GeminiHandler
+
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        questions = _read_lines(f)
+
+    path = PDFManager().get_pdf_path(args.id)
+    if not path:
+        out.write({"input": args.id, "error": "download failed"})
+        return
+    base = GeminiHandler()
+    if not base.upload_file(path):
+        out.write({"input": args.id, "error": "upload failed"})
+        return
+
+    def answer(handler, q):
+        a = handler.send_message(q)
+        if handler.last_error:
+            return {"input": args.id, "question": q, "error": handler.last_error}
+        return {"input": args.id, "question": q, "answer": a}
+
+    if args.workers <= 1:
+        # 单会话顺序提问，后面的问题能看到前面的上下文
+        if not base.start_chat():
+            out.write({"input": args.id, "error": "chat session not started"})
+            return
+        for q in questions:
+            out.write(answer(base, q))
+        return
+
+    def ask(q):
+        # 并发模式：每个问题一个独立会话，共享已上传的文件
+        h = GeminiHandler()
+        h.uploaded_file = base.uploaded_file
+        if not h.start_chat():
+            return {"input": args.id, "question": q, "error": "chat session not started"}
+        return answer(h, q)
+
+    run_pool(ask, questions, out, args.workers)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Research Assistant headless pipelines (JSONL to stdout)")
+    parser.add_argument("--perf", action="store_true", help="结束时把各环节耗时汇总输出到 stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sync", help="同步 Zotero 文献库")
+    p.add_argument("--force", action="store_true", help="忽略本地缓存，重新全量同步")
+    p.add_argument("--raw", action="store_true", help="输出完整的 Zotero 条目")
+    p.set_defaults(func=cmd_sync)
+
+    p = sub.add_parser("radar", help="根据 Zotero 画像推荐 ArXiv 新论文")
+    p.add_argument("--max-results", type=int, default=10)
+    p.set_defaults(func=cmd_radar)
+
+    p = sub.add_parser("graph", help="构建引用图谱 (ArXiv ID / 标题 / S2 paperId)")
+    p.add_argument("ids", nargs="*")
+    p.add_argument("--input", help="每行一个输入的文件，- 表示 stdin")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--refresh", action="store_true", help="忽略本地图谱库，重新抓取")
+    p.add_argument("--analyze", action="store_true", help="附带 LLM 阅读路径推荐")
+    p.add_argument("--workers", type=int, default=4)
+    p.set_defaults(func=cmd_graph)
+
+    p = sub.add_parser("fetch-pdfs", help="批量下载 ArXiv PDF")
+    p.add_argument("ids", nargs="*")
+    p.add_argument("--input", help="每行一个 ArXiv ID 的文件，- 表示 stdin")
+    p.add_argument("--workers", type=int, default=4)
+    p.set_defaults(func=cmd_fetch_pdfs)
+
+    p = sub.add_parser("ask", help="用 Gemini 针对论文全文批量提问")
+    p.add_argument("id", help="ArXiv ID")
+    p.add_argument("--questions", required=True, help="每行一个问题的文件")
+    p.add_argument("--workers", type=int, default=1, help=">1 时每个问题使用独立会话并发提问")
+    p.set_defaults(func=cmd_ask)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = JsonlWriter(sys.stdout)
+    # 引擎内部的 print 全部转到 stderr，stdout 只输出 JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        args.func(args, out)
+        if args.perf:
+            from perf_monitor import recorder
+            print(json.dumps(recorder.summary(), ensure_ascii=False, indent=2))
+    return 1 if out.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
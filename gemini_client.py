@@ -2,6 +2,7 @@ import google.generativeai as genai
 import time
 import os
 from main import cm
+from perf_monitor import timed, current_span
 
 class GeminiHandler:
     def __init__(self):
@@ -15,6 +16,7 @@ class GeminiHandler:
             self.is_ready = True
         
         self.chat_session = None
+        self.last_error = None  # 最近一次 send_message 的错误 (成功时为 None)，供批处理判断
         self.uploaded_file = None
 
     def list_available_models(self):
@@ -26,6 +28,7 @@ class GeminiHandler:
             print(f"List Models Error: {e}")
             return []
 
+    @timed("gemini.upload_file", upstream="gemini")
     def upload_file(self, file_path: str, progress_callback=None):
         """上传 PDF 文件到 Google 服务器 (带进度回调)"""
         if not self.is_ready: 
@@ -35,6 +38,7 @@ class GeminiHandler:
         try:
             if progress_callback: progress_callback(10, "正在上传文件到 Google Cloud...")
             print(f"📤 Uploading to Gemini: {file_path}")
+            current_span().add_bytes(os.path.getsize(file_path))
             
             sample_file = genai.upload_file(path=file_path, display_name="Research Paper")
             
@@ -46,6 +50,7 @@ class GeminiHandler:
                 time.sleep(2)
                 sample_file = genai.get_file(sample_file.name)
                 wait_count += 1
+                current_span().attrs["poll_count"] = wait_count
                 if progress_callback: 
                     progress = min(40 + wait_count * 5, 90)
                     progress_callback(progress, f"文件处理中 ({sample_file.state.name})...")
@@ -59,6 +64,7 @@ class GeminiHandler:
             if progress_callback: progress_callback(100, "处理完成！")
             return True
         except Exception as e:
+            current_span().error = type(e).__name__
             print(f"❌ Gemini Upload Error: {e}")
             return False
 
@@ -92,15 +98,21 @@ class GeminiHandler:
             print(f"Start Chat Error: {e}")
             return False
 
+    @timed("gemini.send_message", upstream="gemini")
     def send_message(self, message: str):
         """发送消息"""
         if not self.chat_session:
             # 尝试重新初始化
             if not self.start_chat():
+                self.last_error = "chat session not started"
                 return "错误：无法启动对话会话，请检查模型名称是否正确 (例如 gemini-2.5-pro-preview-03-25)。"
         
         try:
             response = self.chat_session.send_message(message)
+            current_span().add_bytes(len(message.encode('utf-8')) + len(response.text.encode('utf-8')))
+            self.last_error = None
             return response.text
         except Exception as e:
+            current_span().error = type(e).__name__
+            self.last_error = f"{type(e).__name__}: {e}"
             return f"Gemini Error: {str(e)}"
\ No newline at end of file
@@ -2,39 +2,54 @@ import requests
 import networkx as nx
 import json
 import re
+import time
 from main import cm
-from openai import OpenAI
+from graph_store import GraphStore
+from perf_monitor import timed, current_span
 
 class GraphEngine:
+    S2_API = "https://api.semanticscholar.org/graph/v1"
+
     def __init__(self):
         s2_key = cm.get("S2_API_KEY")
         self.headers = {"x-api-key": s2_key} if s2_key and len(s2_key) > 10 else {}
         
         # 这里依然保留 OpenAI 兼容接口用于图谱分析（轻量级任务），也可以换成 Gemini
-        base_url = cm.get("OPENAI_BASE_URL")
-        api_key = cm.get("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=api_key, base_url=base_url) if api_key else None
+        # openai SDK 导入较慢，首次调用 analyze_recommendations 时才创建客户端
+        self.base_url = cm.get("OPENAI_BASE_URL")
+        self.api_key = cm.get("OPENAI_API_KEY")
+        self.client = None
         self.model = cm.get("OPENAI_MODEL")
 
+        # 本地持久化图谱：每次抓取都会并入，已展开过的论文不再走网络
+        self.store = GraphStore(cm.get("GRAPH_DB_PATH", "./graph_store.db"))
+        # 超过该时长 (秒) 的本地图谱视为过期，重新抓取以获得新的被引
+        self.max_age = cm.get("GRAPH_MAX_AGE", 3 * 24 * 3600)
+
     def _is_arxiv_id(self, query: str) -> bool:
         # 简单的 ArXiv ID 正则，如 2310.12345 或 2310.12345v1
         return re.match(r'^\d{4}\.\d{4,5}(v\d+)?$', query.strip()) is not None
 
+    @timed("graph.get_paper_metadata", upstream="semantic_scholar")
     def get_paper_metadata(self, query: str):
         """智能获取论文元数据：优先 ID，其次标题"""
         if self._is_arxiv_id(query):
             # 使用 ArXiv ID 直接查询 Graph API
             print(f"🔍 Detected ArXiv ID: {query}")
-            url = f"https://api.semanticscholar.org/graph/v1/paper/arxiv:{query}"
+            url = f"{self.S2_API}/paper/arxiv:{query}"
             params = {"fields": "paperId,title,abstract,year,authors,citationCount"}
         else:
             # 标题搜索
             print(f"🔍 Searching Title: {query}")
-            url = "https://api.semanticscholar.org/graph/v1/paper/search"
+            url = f"{self.S2_API}/paper/search"
             params = {"query": query, "limit": 1, "fields": "paperId,title,abstract,year,authors,citationCount"}
 
         try:
             r = requests.get(url, headers=self.headers, params=params, timeout=10)
+            current_span().add_bytes(len(r.content))
+            current_span().attrs["status"] = r.status_code
+            # 429 / 5xx 时 S2 返回 {"message": ...}，记为错误以便按上游统计
+            if r.status_code >= 400: current_span().error = f"HTTP {r.status_code}"
             data = r.json()
             
             if 'data' in data: # Search endpoint returns {data: [...]}
@@ -44,19 +59,47 @@ class GraphEngine:
             else:
                 return None
         except Exception as e:
+            current_span().error = type(e).__name__
             print(f"S2 Error: {e}")
             return None
 
-    def build_graph(self, root_paper_id: str, limit=20):
-        """构建图谱"""
+    def _s2_get(self, url, span, retries=3, **kwargs):
+        """GET S2 接口：429 时按 Retry-After 退避重试，重试用尽后返回最后一次响应"""
+        for i in range(retries):
+            span.retries = i
+            r = requests.get(url, headers=self.headers, timeout=30, **kwargs)
+            if r.status_code != 429 or i == retries - 1:
+                return r
+            try:
+                wait = min(float(r.headers.get("Retry-After", "")), 60)
+            except ValueError:
+                wait = 2 ** i
+            print(f"⏳ S2 rate limited, retrying in {wait:.0f}s (Attempt {i+1}/{retries})")
+            time.sleep(wait)
+
+    @timed("graph.build_graph", upstream="semantic_scholar")
+    def build_graph(self, root_paper_id: str, limit=20, force_refresh=False):
+        """构建图谱 (优先读取本地图谱库)"""
+        span = current_span()
+        if not force_refresh and self.store.is_expanded(root_paper_id, max_age=self.max_age):
+            print(f"📖 Graph loaded from local store: {root_paper_id}")
+            span.cache_hit = True
+            span.upstream = "graph_store"  # 本地命中，不计入 Semantic Scholar 的耗时
+            return self.store.ego_graph(root_paper_id, limit=limit)
+        span.cache_hit = False
+
         G = nx.DiGraph()
         fields = "paperId,title,citationCount,references.paperId,references.title,references.citationCount,citations.paperId,citations.title,citations.citationCount"
-        url = f"https://api.semanticscholar.org/graph/v1/paper/{root_paper_id}?fields={fields}"
+        url = f"{self.S2_API}/paper/{root_paper_id}?fields={fields}"
         
         try:
-            r = requests.get(url, headers=self.headers)
+            r = self._s2_get(url, span)
+            span.add_bytes(len(r.content))
+            span.attrs["status"] = r.status_code
+            if r.status_code >= 400: span.error = f"HTTP {r.status_code}"
             data = r.json()
             if 'paperId' not in data: return G, {}
+            self.store.merge_paper(data)
 
             # Root
             root_node = {"id": data['paperId'], "label": data['title'], "type": "root"}
@@ -84,12 +127,88 @@ class GraphEngine:
                 known_nodes[c['paperId']] = n
                 
             return G, known_nodes
-        except:
+        except Exception as e:
+            span.error = type(e).__name__
             return G, {}
 
+    def _external_id(self, item):
+        """Zotero 条目 -> S2 可识别的外部 ID (优先 ArXiv，其次 DOI)"""
+        d = item.get('data', {})
+        text = " ".join(str(d.get(k) or '') for k in ('archiveID', 'url', 'DOI', 'extra'))
+        m = re.search(r'(?:arxiv[:./]|abs/)(\d{4}\.\d{4,5})', text, re.IGNORECASE)
+        if m: return f"ARXIV:{m.group(1)}"
+        if d.get('DOI'): return f"DOI:{d['DOI']}"
+        return None
+
+    @timed("graph.resolve_library", upstream="semantic_scholar")
+    def resolve_library(self, zotero_items):
+        """把 Zotero 条目映射为 S2 paperId (结果缓存在本地图谱库，只查询未解析过的条目)"""
+        span = current_span()
+        by_key = {i['key']: i for i in zotero_items if i.get('key')}
+        resolved, pending = self.store.library_ids(by_key.keys(), max_age=self.max_age)
+        span.cache_hit = not pending
+        for i in range(0, len(pending), 500):
+            chunk = pending[i:i + 500]
+            ext = {k: self._external_id(by_key[k]) for k in chunk}
+            keys = [k for k in chunk if ext[k]]
+            mapping = {k: None for k in chunk}
+            if keys:
+                try:
+                    # batch 接口按输入顺序返回，查不到的位置为 null
+                    r = requests.post(f"{self.S2_API}/paper/batch", params={"fields": "paperId"},
+                                      json={"ids": [ext[k] for k in keys]}, headers=self.headers, timeout=30)
+                    span.add_bytes(len(r.content))
+                    span.attrs["status"] = r.status_code
+                    if r.status_code >= 400: span.error = f"HTTP {r.status_code}"
+                    data = r.json()
+                    if not isinstance(data, list):
+                        print(f"S2 Batch Error: {data}")
+                        continue
+                    for k, paper in zip(keys, data):
+                        mapping[k] = paper.get('paperId') if paper else None
+                except Exception as e:
+                    span.error = type(e).__name__
+                    print(f"S2 Batch Error: {e}")
+                    continue
+            self.store.save_library_ids(mapping)
+            resolved.update({k: v for k, v in mapping.items() if v})
+        print(f"📚 Resolved {len(resolved)}/{len(by_key)} library items to S2 papers")
+        return resolved
+
+    def library_citers(self, zotero_items, min_count=2, max_expand=50, limit=50):
+        """找出引用了至少 min_count 篇库内论文的 (库外) 论文
+
+        先把库内论文解析为 S2 paperId，再展开尚未抓取 (或已过期) 的库内论文，最后在本地图谱库里统计。
+        每次最多联网展开 max_expand 篇，其余留到下次调用。
+        返回 (结果列表, report)，report 记录展开失败 / 推迟的篇数，非零时结果不完整。
+        """
+        library_ids = list(self.resolve_library(zotero_items).values())
+        stale = [pid for pid in library_ids if not self.store.is_expanded(pid, max_age=self.max_age)]
+        todo = stale[:max_expand]
+        expanded, streak = 0, 0
+        for pid in todo:
+            _, known = self.build_graph(pid)
+            if known:
+                expanded, streak = expanded + 1, 0
+                continue
+            streak += 1
+            # build_graph 已对 429 退避重试，连续失败说明仍在被限流，剩余的留到下次
+            if streak >= 3:
+                print("⚠️ S2 keeps failing, stop expanding library papers")
+                break
+        report = {"library": len(library_ids), "expanded": expanded,
+                  "failed": len(todo) - expanded, "deferred": len(stale) - len(todo)}
+        if report["failed"] or report["deferred"]:
+            print(f"⚠️ {report['failed']} library papers failed to expand, {report['deferred']} deferred, results may be incomplete")
+        return self.store.papers_citing(library_ids, min_count=min_count, limit=limit), report
+
+    @timed("graph.analyze_recommendations", upstream="openai")
     def analyze_recommendations(self, G, known_nodes):
         """AI 推荐阅读（不限数量）"""
-        if not self.client: return {"error": "No API Key"}
+        if not self.api_key: return {"error": "No API Key"}
+        if not self.client:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
         
         # 将图数据转为文本上下文
         nodes_desc = []
@@ -129,6 +248,9 @@ class GraphEngine:
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"}
             )
+            if getattr(resp, 'usage', None):
+                current_span().attrs["total_tokens"] = resp.usage.total_tokens
             return json.loads(resp.choices[0].message.content)
         except Exception as e:
+            current_span().error = type(e).__name__
             return {"error": str(e)}
\ No newline at end of file
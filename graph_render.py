@@ -0,0 +1,142 @@
+import hashlib
+import json
+from collections import OrderedDict
+import numpy as np
+import networkx as nx
+from pyvis.network import Network
+from perf_monitor import timed, current_span
+
+NODE_COLORS = {"root": "#e74c3c", "reference": "#3498db", "cited_by": "#2ecc71"}
+DEFAULT_COLOR = "#95a5a6"
+
+# 关闭物理引擎 + 直线边，浏览器只负责绘制预先算好的坐标
+VIS_OPTIONS = {
+    "physics": {"enabled": False},
+    "edges": {"smooth": False, "arrows": {"to": {"enabled": True, "scaleFactor": 0.4}}},
+    "interaction": {"hideEdgesOnDrag": True, "hideEdgesOnZoom": True, "tooltipDelay": 150}
+}
+
+# 点击节点时展开其被隐藏的邻居 (所有节点都已带坐标下发，无需回传服务端)
+EXPAND_ON_CLICK_JS = """
+<script type="text/javascript">
+  network.on("click", function (params) {
+      if (!params.nodes.length) return;
+      var ids = network.getConnectedNodes(params.nodes[0]);
+      nodes.update(ids.map(function (id) { return {id: id, hidden: false}; }));
+  });
+</script>
+"""
+
+_LAYOUT_CACHE = OrderedDict()
+_LAYOUT_CACHE_SIZE = 16
+
+def graph_signature(G) -> str:
+    """图结构指纹，用作布局缓存的 key"""
+    h = hashlib.sha1()
+    h.update(json.dumps(sorted(map(str, G.nodes))).encode())
+    h.update(json.dumps(sorted((str(u), str(v)) for u, v in G.edges())).encode())
+    return h.hexdigest()
+
+def rank_nodes(G):
+    """按中心性从高到低排序节点 (度中心性，root 永远排第一)"""
+    degree = dict(G.degree())
+    roots = [n for n, t in G.nodes(data="type") if t == "root"]
+    rest = sorted((n for n in G.nodes if n not in roots), key=lambda n: degree[n], reverse=True)
+    return roots + rest
+
+def _force_layout(n, edges, iterations=50, seed=42):
+    """向量化 Fruchterman-Reingold，返回 [-1, 1] 范围内的 (n, 2) 坐标"""
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1, 1, (n, 2)).astype(np.float32)
+    if n < 2: return pos
+
+    k = np.float32(1.0 / np.sqrt(n))
+    t = 0.1
+    dt = t / (iterations + 1)
+    src, dst = (edges[:, 0], edges[:, 1]) if len(edges) else (None, None)
+    for _ in range(iterations):
+        # 斥力 k^2 / d，方向为 (p_i - p_j) / d；展开成矩阵乘法，避免 (n, n, 2) 的中间数组
+        sq = (pos ** 2).sum(axis=1)
+        dist2 = np.maximum(sq[:, None] + sq[None, :] - 2 * pos @ pos.T, 1e-4)
+        w = (k * k) / dist2
+        np.fill_diagonal(w, 0)
+        disp = pos * w.sum(axis=1)[:, None] - w @ pos
+        if src is not None:
+            d = pos[src] - pos[dst]
+            f = d * (np.linalg.norm(d, axis=1) / k)[:, None]
+            np.add.at(disp, src, -f)
+            np.add.at(disp, dst, f)
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-6)
+        pos += disp * (np.minimum(length, t) / length)[:, None]
+        t -= dt
+
+    pos -= pos.mean(axis=0)
+    scale = np.abs(pos).max()
+    return pos / scale if scale > 0 else pos
+
+@timed("graph.compute_layout")
+def compute_layout(G, max_layout_nodes=1000, iterations=50, seed=42):
+    """服务端计算布局 (按图结构与布局参数缓存)
+
+    超过 max_layout_nodes 的图只对中心性最高的节点做力导向布局，
+    其余节点摆放在其已布局邻居附近，避免 O(n^2) 斥力计算失控。
+    """
+    sig = (graph_signature(G), max_layout_nodes, iterations, seed)
+    current_span().attrs["nodes"] = G.number_of_nodes()
+    current_span().cache_hit = sig in _LAYOUT_CACHE
+    if sig in _LAYOUT_CACHE:
+        _LAYOUT_CACHE.move_to_end(sig)
+        return _LAYOUT_CACHE[sig]
+
+    ranked = rank_nodes(G)
+    core = ranked[:max_layout_nodes]
+    idx = {n: i for i, n in enumerate(core)}
+    edges = np.array([(idx[u], idx[v]) for u, v in G.edges() if u in idx and v in idx],
+                     dtype=np.int64).reshape(-1, 2)
+    coords = _force_layout(len(core), edges, iterations=iterations, seed=seed)
+    pos = {n: (float(coords[i, 0]), float(coords[i, 1])) for n, i in idx.items()}
+
+    rng = np.random.default_rng(seed)
+    for n in ranked[max_layout_nodes:]:
+        anchor = next((m for m in nx.all_neighbors(G, n) if m in pos), None)
+        ax, ay = pos[anchor] if anchor is not None else (0.0, 0.0)
+        jx, jy = rng.normal(0, 0.03, 2)
+        pos[n] = (ax + float(jx), ay + float(jy))
+
+    _LAYOUT_CACHE[sig] = pos
+    if len(_LAYOUT_CACHE) > _LAYOUT_CACHE_SIZE:
+        _LAYOUT_CACHE.popitem(last=False)
+    return pos
+
+@timed("graph.render_html")
+def render_graph_html(G, budget=150, max_nodes=3000, height="650px"):
+    """生成 pyvis HTML：预计算坐标、关闭物理引擎，按中心性只显示 budget 个节点，其余点击展开"""
+    ranked = rank_nodes(G)[:max_nodes]
+    if len(ranked) < G.number_of_nodes():
+        G = G.subgraph(ranked)
+    visible = set(ranked[:budget])
+    pos = compute_layout(G)
+    spread = 120 * max(np.sqrt(G.number_of_nodes()), 4)
+    degree = dict(G.degree())
+
+    net = Network(height=height, width="100%", directed=True, cdn_resources="remote")
+    for n in ranked:
+        attrs = G.nodes[n]
+        label = attrs.get("label") or str(n)
+        x, y = pos[n]
+        net.add_node(
+            n,
+            label=label[:30] + ("…" if len(label) > 30 else ""),
+            title=label,
+            color=NODE_COLORS.get(attrs.get("type"), DEFAULT_COLOR),
+            size=10 + min(degree[n], 20),
+            x=x * spread, y=y * spread,
+            physics=False,
+            hidden=n not in visible
+        )
+    for u, v in G.edges():
+        net.add_edge(u, v)
+    net.set_options(json.dumps(VIS_OPTIONS))
+
+    html = net.generate_html()
+    return html.replace("</body>", EXPAND_ON_CLICK_JS + "</body>")
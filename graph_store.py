@@ -0,0 +1,224 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+import networkx as nx
+
+# 边的方向与 GraphEngine.build_graph 保持一致：(src, dst) 表示 dst 引用了 src
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    paper_id TEXT PRIMARY KEY,
+    title TEXT,
+    citation_count INTEGER,
+    expanded_at REAL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    PRIMARY KEY (src, dst)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_edges_dst ON edges (dst, src);
+CREATE TABLE IF NOT EXISTS library_map (
+    zotero_key TEXT PRIMARY KEY,
+    paper_id TEXT,
+    resolved_at REAL
+);
+"""
+
+class GraphStore:
+    """持久化的个人引用图谱：累积所有抓取过的节点与边，图谱查询优先本地命中"""
+
+    def __init__(self, db_path="./graph_store.db"):
+        self.db_path = db_path
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        if not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 每次操作单独建立连接，Streamlit 的多线程 rerun 下更安全
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- 写入 ---
+    def merge_paper(self, data: dict):
+        """合并一次 S2 论文查询结果 (含 references / citations)，并标记该论文已展开"""
+        root_id = data.get('paperId')
+        if not root_id: return
+
+        nodes = [(root_id, data.get('title'), data.get('citationCount'))]
+        edges = []
+        for r in data.get('references') or []:
+            if not r.get('paperId'): continue
+            nodes.append((r['paperId'], r.get('title'), r.get('citationCount')))
+            edges.append((r['paperId'], root_id))
+        for c in data.get('citations') or []:
+            if not c.get('paperId'): continue
+            nodes.append((c['paperId'], c.get('title'), c.get('citationCount')))
+            edges.append((root_id, c['paperId']))
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO nodes (paper_id) VALUES (?)", [(n[0],) for n in nodes])
+            new_nodes = conn.total_changes - before
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO edges (src, dst) VALUES (?, ?)", edges)
+            new_edges = conn.total_changes - before
+            # 新数据只覆盖非空字段，避免把已有的标题 / 引用数冲掉
+            conn.executemany("""
+                INSERT INTO nodes (paper_id, title, citation_count) VALUES (?, ?, ?)
+                ON CONFLICT(paper_id) DO UPDATE SET
+                    title = COALESCE(excluded.title, nodes.title),
+                    citation_count = COALESCE(excluded.citation_count, nodes.citation_count)
+            """, nodes)
+            conn.execute("UPDATE nodes SET expanded_at = ? WHERE paper_id = ?", (time.time(), root_id))
+        print(f"💾 Graph store merged {root_id}: +{new_nodes} new nodes, +{new_edges} new edges")
+
+    # --- 查询 ---
+    def is_expanded(self, paper_id: str, max_age=None) -> bool:
+        """该论文的引用 / 被引是否已完整抓取过 (可选: 不超过 max_age 秒)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT expanded_at FROM nodes WHERE paper_id = ?", (paper_id,)).fetchone()
+        if not row or row[0] is None: return False
+        return max_age is None or time.time() - row[0] <= max_age
+
+    def _node_rows(self, conn, paper_ids):
+        rows = {}
+        ids = list(paper_ids)
+        # SQLite 变量个数有上限，分批查询
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for pid, title, cnt in conn.execute(
+                    f"SELECT paper_id, title, citation_count FROM nodes WHERE paper_id IN ({marks})", chunk):
+                rows[pid] = (title, cnt)
+        return rows
+
+    def ego_graph(self, root_id: str, limit=20):
+        """从本地重建与 GraphEngine.build_graph 相同结构的一跳图谱"""
+        G = nx.DiGraph()
+        with self._connect() as conn:
+            root = conn.execute("SELECT title FROM nodes WHERE paper_id = ?", (root_id,)).fetchone()
+            if not root: return G, {}
+            refs = conn.execute("""
+                SELECT n.paper_id, n.title FROM edges e JOIN nodes n ON n.paper_id = e.src
+                WHERE e.dst = ? ORDER BY COALESCE(n.citation_count, 0) DESC LIMIT ?
+            """, (root_id, limit)).fetchall()
+            cits = conn.execute("""
+                SELECT n.paper_id, n.title FROM edges e JOIN nodes n ON n.paper_id = e.dst
+                WHERE e.src = ? ORDER BY COALESCE(n.citation_count, 0) DESC LIMIT ?
+            """, (root_id, limit)).fetchall()
+
+        root_node = {"id": root_id, "label": root[0], "type": "root"}
+        G.add_node(root_id, **root_node)
+        known_nodes = {root_id: root_node}
+        for pid, title in refs:
+            n = {"id": pid, "label": title, "type": "reference"}
+            G.add_node(pid, **n)
+            G.add_edge(pid, root_id)
+            known_nodes[pid] = n
+        for pid, title in cits:
+            n = {"id": pid, "label": title, "type": "cited_by"}
+            G.add_node(pid, **n)
+            G.add_edge(root_id, pid)
+            known_nodes[pid] = n
+        return G, known_nodes
+
+    def k_hop(self, paper_id: str, k=2, direction="both", max_nodes=5000):
+        """本地 k 跳邻域子图；direction 可为 'references' / 'citations' / 'both'"""
+        G = nx.DiGraph()
+        visited = {paper_id}
+        frontier = [paper_id]
+        edges = set()
+        with self._connect() as conn:
+            for _ in range(k):
+                if not frontier or len(visited) >= max_nodes: break
+                next_frontier = []
+                for i in range(0, len(frontier), 500):
+                    chunk = frontier[i:i + 500]
+                    marks = ",".join("?" * len(chunk))
+                    found = []
+                    if direction in ("references", "both"):
+                        found += conn.execute(f"SELECT src, dst FROM edges WHERE dst IN ({marks})", chunk).fetchall()
+                    if direction in ("citations", "both"):
+                        found += conn.execute(f"SELECT src, dst FROM edges WHERE src IN ({marks})", chunk).fetchall()
+                    for src, dst in found:
+                        for n in (src, dst):
+                            if n not in visited and len(visited) < max_nodes:
+                                visited.add(n)
+                                next_frontier.append(n)
+                        if src in visited and dst in visited:
+                            edges.add((src, dst))
+                frontier = next_frontier
+            rows = self._node_rows(conn, visited)
+
+        for n in visited:
+            title, cnt = rows.get(n, (None, None))
+            G.add_node(n, id=n, label=title, citationCount=cnt,
+                       type="root" if n == paper_id else "neighbor")
+        G.add_edges_from(edges)
+        return G
+
+    def papers_citing(self, library_ids, min_count=2, limit=50):
+        """找出至少引用了 min_count 篇库内论文的论文，按命中数降序"""
+        library_ids = list(set(library_ids))
+        if not library_ids: return []
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS lib (paper_id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM lib")
+            conn.executemany("INSERT OR IGNORE INTO lib VALUES (?)", [(i,) for i in library_ids])
+            rows = conn.execute("""
+                SELECT e.dst, n.title, COUNT(*) AS hits
+                FROM edges e JOIN lib l ON l.paper_id = e.src
+                LEFT JOIN nodes n ON n.paper_id = e.dst
+                WHERE e.dst NOT IN (SELECT paper_id FROM lib)
+                GROUP BY e.dst HAVING hits >= ?
+                ORDER BY hits DESC LIMIT ?
+            """, (min_count, limit)).fetchall()
+        return [{"paperId": pid, "title": title, "library_hits": hits} for pid, title, hits in rows]
+
+    # --- Zotero 条目 -> S2 paperId 映射 ---
+    def library_ids(self, zotero_keys, max_age=None):
+        """返回 (已解析的 {zotero_key: paper_id}, 需要重新解析的 zotero_key 列表)
+
+        解析失败的条目也会记录 (paper_id 为空)，在 max_age 秒内不再重复查询。
+        """
+        keys = list(set(zotero_keys))
+        resolved, pending = {}, []
+        with self._connect() as conn:
+            rows = {}
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for key, pid, ts in conn.execute(
+                        f"SELECT zotero_key, paper_id, resolved_at FROM library_map WHERE zotero_key IN ({marks})", chunk):
+                    rows[key] = (pid, ts)
+        now = time.time()
+        for key in keys:
+            pid, ts = rows.get(key, (None, None))
+            if ts is None or (pid is None and max_age is not None and now - ts > max_age):
+                pending.append(key)
+            elif pid:
+                resolved[key] = pid
+        return resolved, pending
+
+    def save_library_ids(self, mapping: dict):
+        """mapping: {zotero_key: paper_id 或 None}"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO library_map (zotero_key, paper_id, resolved_at) VALUES (?, ?, ?)",
+                             [(k, v, now) for k, v in mapping.items()])
+
+    def stats(self):
+        with self._connect() as conn:
+            n_nodes = conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+            n_edges = conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+            n_expanded = conn.execute("SELECT COUNT(*) FROM nodes WHERE expanded_at IS NOT NULL").fetchone()[0]
+        return {"nodes": n_nodes, "edges": n_edges, "expanded": n_expanded}
@@ -1,10 +1,10 @@
 import os
 import yaml
-import arxiv
 import re
 from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List
+from perf_monitor import recorder, timed, current_span
 
 # --- 配置管理 ---
 class ConfigManager:
@@ -23,7 +23,11 @@ class ConfigManager:
             "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", ""),
             "GEMINI_MODEL": os.getenv("GEMINI_MODEL", "gemini-2.5-pro"),
             "S2_API_KEY": os.getenv("S2_API_KEY", ""),
-            "PDF_CACHE_DIR": "./pdf_cache"
+            "PDF_CACHE_DIR": "./pdf_cache",
+            "GRAPH_DB_PATH": "./graph_store.db",
+            "GRAPH_MAX_AGE": 3 * 24 * 3600,  # 本地图谱的有效期 (秒)，过期后重新抓取被引
+            "PERF_LOG_FILE": "",  # 每个埋点 span 追加一行 JSON，留空则不写
+            "METRICS_PORT": 0     # >0 时在该端口提供 Prometheus /metrics
         }
         if os.path.exists(self.config_path):
             try:
@@ -49,12 +53,14 @@ class ConfigManager:
         return self.config.get(key, default)
 
 cm = ConfigManager()
+recorder.configure(log_file=cm.get("PERF_LOG_FILE"))
 
 # --- 真实 ArXiv 雷达逻辑 ---
 class ArxivRadar:
     def __init__(self):
         self.categories = cm.get("ARXIV_CATEGORIES")
 
+    @timed("radar.extract_keywords")
     def _extract_keywords(self, zotero_items, top_n=5):
         """从用户文献库中提取高频关键词"""
         if not zotero_items: return ["World Model", "Autonomous Driving"]
@@ -84,6 +90,7 @@ class ArxivRadar:
         print(f"🔍 Extracted User Interests: {common}")
         return common
 
+    @timed("radar.recommend_papers", upstream="arxiv")
     def recommend_papers(self, zotero_items, max_results=10):
         """
         1. 分析 Zotero 偏好
@@ -100,6 +107,7 @@ class ArxivRadar:
         print(f"📡 ArXiv Query: {search_query}")
         
         try:
+            import arxiv  # 延迟导入，只有真正查询 ArXiv 时才加载 (CLI 启动更快)
             client = arxiv.Client()
             search = arxiv.Search(
                 query=search_query,
@@ -121,7 +129,9 @@ class ArxivRadar:
                     "url": r.entry_id,
                     "arxiv_id": r.entry_id.split('/')[-1].split('v')[0]
                 })
+            current_span().attrs["results"] = len(results)
             return results
         except Exception as e:
+            current_span().error = type(e).__name__
             print(f"ArXiv Error: {e}")
             return []
\ No newline at end of file
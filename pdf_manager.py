@@ -2,13 +2,17 @@ import os
 import requests
 import time
 from main import cm
+from perf_monitor import timed, current_span
 
 class PDFManager:
+    ARXIV_PDF_URL = "https://arxiv.org/pdf"
+
     def __init__(self):
         self.cache_dir = cm.get("PDF_CACHE_DIR", "./pdf_cache")
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
+    @timed("pdf.get_pdf_path", upstream="arxiv")
     def get_pdf_path(self, arxiv_id: str) -> str:
         """获取本地 PDF 路径，如果不存在则下载"""
         # 清洗 ID (处理版本号如 v1)
@@ -17,13 +21,15 @@ class PDFManager:
         file_path = os.path.join(self.cache_dir, filename)
 
         if os.path.exists(file_path):
+            current_span().cache_hit = True
             return file_path
         
+        current_span().cache_hit = False
         return self._download_from_arxiv(clean_id, file_path)
 
     def _download_from_arxiv(self, arxiv_id: str, save_path: str) -> str:
         """从 ArXiv 下载 PDF"""
-        url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+        url = f"{self.ARXIV_PDF_URL}/{arxiv_id}.pdf"
         print(f"⬇️ Downloading PDF: {url}")
         
         headers = {
@@ -32,6 +38,9 @@ class PDFManager:
         
         try:
             response = requests.get(url, headers=headers, timeout=30)
+            current_span().add_bytes(len(response.content))
+            current_span().attrs["status"] = response.status_code
+            if response.status_code >= 400: current_span().error = f"HTTP {response.status_code}"
             if response.status_code == 200:
                 with open(save_path, 'wb') as f:
                     f.write(response.content)
@@ -41,5 +50,6 @@ class PDFManager:
                 print(f"❌ Download failed: {response.status_code}")
                 return None
         except Exception as e:
+            current_span().error = type(e).__name__
             print(f"❌ Network error during download: {e}")
             return None
\ No newline at end of file
@@ -0,0 +1,193 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- 轻量级性能埋点 ---
+class Span:
+    """一次被埋点调用的记录：耗时、传输字节、缓存命中、重试次数"""
+
+    def __init__(self, name, upstream=None, parent=None):
+        self.name = name
+        self.upstream = upstream
+        self.parent = parent
+        self.start = time.time()
+        self.duration = 0.0
+        self.bytes = 0
+        self.cache_hit = None
+        self.retries = 0
+        self.error = None
+        self.attrs = {}
+
+    def add_bytes(self, n):
+        self.bytes += n or 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "upstream": self.upstream,
+            "parent": self.parent,
+            "start": round(self.start, 3),
+            "duration_ms": round(self.duration * 1000, 2),
+            "bytes": self.bytes,
+            "cache_hit": self.cache_hit,
+            "retries": self.retries,
+            "error": self.error,
+            **self.attrs
+        }
+
+class PerfRecorder:
+    def __init__(self, max_spans=2000):
+        self.spans = deque(maxlen=max_spans)
+        self.totals = defaultdict(lambda: {"count": 0, "seconds": 0.0, "bytes": 0,
+                                           "cache_hits": 0, "retries": 0, "errors": 0})
+        self.log_file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._server = None
+
+    def configure(self, log_file=None):
+        """log_file: 每个 span 追加一行 JSON 的结构化日志文件 (为空则不写)"""
+        self.log_file = log_file or None
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self) -> Span:
+        """当前线程正在执行的 span；不在埋点范围内时返回一个不会被记录的空 span"""
+        stack = self._stack()
+        return stack[-1] if stack else Span("untracked")
+
+    def timed(self, name, upstream=None):
+        """装饰器：为函数调用记录一个 span"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                stack = self._stack()
+                span = Span(name, upstream, parent=stack[-1].name if stack else None)
+                stack.append(span)
+                t0 = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    span.error = type(e).__name__
+                    raise
+                finally:
+                    span.duration = time.perf_counter() - t0
+                    stack.pop()
+                    self._record(span)
+            return wrapper
+        return decorator
+
+    def _record(self, span):
+        with self._lock:
+            self.spans.append(span)
+            t = self.totals[(span.name, span.upstream or "")]
+            t["count"] += 1
+            t["seconds"] += span.duration
+            t["bytes"] += span.bytes
+            t["cache_hits"] += 1 if span.cache_hit else 0
+            t["retries"] += span.retries
+            t["errors"] += 1 if span.error else 0
+        if self.log_file:
+            try:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+            except Exception as e:
+                print(f"⚠️ Perf log write failed: {e}")
+
+    def recent(self, n=50):
+        with self._lock:
+            return [s.to_dict() for s in list(self.spans)[-n:]]
+
+    def summary(self):
+        """按 span 名称聚合 (p95 基于最近保留的 span)，按总耗时降序"""
+        with self._lock:
+            durations = defaultdict(list)
+            for s in self.spans:
+                durations[(s.name, s.upstream or "")].append(s.duration)
+            totals = {k: dict(v) for k, v in self.totals.items()}
+
+        rows = []
+        for (name, upstream), t in totals.items():
+            recent = sorted(durations.get((name, upstream), [])) or [0.0]
+            rows.append({
+                "name": name,
+                "upstream": upstream,
+                "count": t["count"],
+                "total_s": round(t["seconds"], 3),
+                "avg_ms": round(t["seconds"] / t["count"] * 1000, 1),
+                "p95_ms": round(recent[min(int(len(recent) * 0.95), len(recent) - 1)] * 1000, 1),
+                "bytes": t["bytes"],
+                "cache_hits": t["cache_hits"],
+                "retries": t["retries"],
+                "errors": t["errors"]
+            })
+        rows.sort(key=lambda r: r["total_s"], reverse=True)
+        return rows
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式 (累计计数器)"""
+        metrics = [
+            ("ra_span_calls_total", "count", "Number of instrumented calls"),
+            ("ra_span_seconds_total", "seconds", "Total wall time spent in instrumented calls"),
+            ("ra_span_bytes_total", "bytes", "Bytes transferred by instrumented calls"),
+            ("ra_span_cache_hits_total", "cache_hits", "Calls served from a local cache"),
+            ("ra_span_retries_total", "retries", "Retries performed against upstreams"),
+            ("ra_span_errors_total", "errors", "Calls that ended in an error")
+        ]
+        with self._lock:
+            totals = {k: dict(v) for k, v in self.totals.items()}
+        lines = []
+        for metric, field, help_text in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (name, upstream), t in sorted(totals.items()):
+                lines.append(f'{metric}{{span="{name}",upstream="{upstream}"}} {t[field]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.totals.clear()
+
+    def serve(self, port: int, host="127.0.0.1"):
+        """在后台线程提供 /metrics (Prometheus) 与 /spans (JSON) 端点，重复调用无副作用"""
+        if self._server: return self._server
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics"):
+                    body, ctype = recorder.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path.startswith("/spans"):
+                    body, ctype = json.dumps(recorder.recent(500), ensure_ascii=False), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️ Metrics server not started on port {port}: {e}")
+            return None
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"📊 Metrics endpoint: http://{host}:{port}/metrics")
+        return self._server
+
+recorder = PerfRecorder()
+timed = recorder.timed
+current_span = recorder.current
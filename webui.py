@@ -1,6 +1,6 @@
 import streamlit as st
 import networkx as nx
-from pyvis.network import Network
+from graph_render import render_graph_html
 import streamlit.components.v1 as components
 import os
 import time
@@ -10,6 +10,7 @@ from graph_engine import GraphEngine
 from zotero_sync import ZoteroSync
 from pdf_manager import PDFManager
 from gemini_client import GeminiHandler
+from perf_monitor import recorder
 
 # --- Page Config ---
 st.set_page_config(page_title="AI Research Assistant Pro", layout="wide", page_icon="🧬")
@@ -35,6 +36,9 @@ if 'engines' not in st.session_state:
 
 engines = st.session_state.engines
 
+if cm.get("METRICS_PORT"):
+    recorder.serve(int(cm.get("METRICS_PORT")))
+
 # --- Auto-Run Logic ---
 if 'zotero_items' not in st.session_state:
     items = engines['zotero'].fetch_all(force_refresh=False)
@@ -84,6 +88,34 @@ with st.sidebar:
             st.session_state.zotero_items = engines['zotero'].fetch_all(force_refresh=True)
             st.rerun()
 
+    with st.expander("🕸️ 本地图谱库"):
+        g_stats = engines['graph'].store.stats()
+        st.caption(f"节点 {g_stats['nodes']} · 边 {g_stats['edges']} · 已展开 {g_stats['expanded']}")
+        min_hits = st.number_input("至少引用库内论文数", min_value=1, value=2)
+        if st.button("查找引用了我的文献的论文"):
+            with st.spinner("解析文献库并展开引用..."):
+                st.session_state.library_citers = engines['graph'].library_citers(
+                    st.session_state.zotero_items, min_count=int(min_hits))
+        citers, report = st.session_state.get('library_citers') or ([], {})
+        if report.get('failed') or report.get('deferred'):
+            st.warning(f"结果不完整：{report['failed']} 篇库内论文展开失败 (可能被 S2 限流)，"
+                       f"{report['deferred']} 篇留待下次展开")
+        for c in citers:
+            st.markdown(f"- **{c['title']}** (引用 {c['library_hits']} 篇)")
+
+    with st.expander("⏱️ 性能监控"):
+        perf_rows = recorder.summary()
+        if perf_rows:
+            st.dataframe(perf_rows, hide_index=True, use_container_width=True)
+            st.caption("最近调用")
+            st.dataframe(list(reversed(recorder.recent(20))), hide_index=True, use_container_width=True)
+            st.download_button("导出 Prometheus 指标", recorder.to_prometheus(), file_name="metrics.prom")
+            if st.button("清空统计"):
+                recorder.reset()
+                st.rerun()
+        else:
+            st.caption("暂无数据")
+
 # --- Functions ---
 def show_home():
     st.title("🧬 Deep Research Graph (Pro)")
@@ -151,10 +183,24 @@ def show_paper_detail():
         st.info(p.get('abstract', '无摘要'))
         # ... (Graph Logic same as before) ...
         if p.get('paperId'):
-             if st.button("生成引用图谱"):
+             g1, g2 = st.columns(2)
+             multi_hop = g1.checkbox("叠加本地图谱 2 跳邻域", value=False)
+             budget = g2.slider("显示节点数 (其余点击展开)", 50, 500, 150, step=50)
+             b1, b2 = st.columns(2)
+             gen_clicked = b1.button("生成引用图谱")
+             refresh_clicked = b2.button("🔄 重新抓取", help="忽略本地图谱库，从 Semantic Scholar 获取最新被引")
+             if gen_clicked or refresh_clicked:
                  with st.spinner("分析中..."):
-                     G, known = engines['graph'].build_graph(p['paperId'])
-                     st.success(f"节点: {len(G.nodes)}")
+                     G, known = engines['graph'].build_graph(p['paperId'], force_refresh=refresh_clicked)
+                     if multi_hop:
+                         G = nx.compose(engines['graph'].store.k_hop(p['paperId'], k=2), G)
+                     st.session_state.graph_view = {'paperId': p['paperId'], 'G': G}
+
+             graph_view = st.session_state.get('graph_view')
+             if graph_view and graph_view['paperId'] == p['paperId']:
+                 G = graph_view['G']
+                 st.success(f"节点: {len(G.nodes)} · 边: {len(G.edges)}")
+                 components.html(render_graph_html(G, budget=budget), height=670)
 
     with c2:
         st.subheader("🤖 Gemini 全文对话")
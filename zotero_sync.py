@@ -4,6 +4,7 @@ import time
 import requests
 from pyzotero import zotero
 from main import cm
+from perf_monitor import timed, current_span
 
 class ZoteroSync:
     def __init__(self):
@@ -11,6 +12,7 @@ class ZoteroSync:
         self.api_key = cm.get("ZOTERO_API_KEY")
         self.lib_type = 'user'
         self.cache_file = "zotero_cache.json"
+        self.page_delay = 0.5  # 分页请求之间的礼貌性间隔 (秒)
         self.zot = None
         
         # 定义允许的论文类型白名单
@@ -31,11 +33,20 @@ class ZoteroSync:
             except Exception as e:
                 print(f"❌ Zotero Init Error: {e}")
 
+    @timed("zotero.items", upstream="zotero")
     def _get_items_robust(self, limit, start, retries=3):
+        span = current_span()
         for i in range(retries):
+            span.retries = i  # 第 i 次尝试之前已经重试了 i 次
             try:
                 # 尝试获取数据
                 items = self.zot.items(limit=limit, start=start)
+                # pyzotero 会把最近一次响应挂在 .request 上
+                resp = getattr(self.zot, 'request', None)
+                if resp is not None: span.add_bytes(len(resp.content))
+                # 带 Retry-After 的 429 不会抛异常，pyzotero 只设置 backoff 并把错误体原样返回
+                if not isinstance(items, list):
+                    raise ValueError(f"Unexpected Zotero response (HTTP {getattr(resp, 'status_code', '?')})")
                 return items
             except Exception as e:
                 error_str = str(e)
@@ -44,6 +55,7 @@ class ZoteroSync:
                     if hasattr(self.zot, 'session'):
                         self.zot.session.trust_env = False
                 time.sleep(2)
+        span.error = "RetriesExhausted"
         return None
 
     def _is_valid_paper(self, item):
@@ -66,7 +78,9 @@ class ZoteroSync:
 
         return True
 
+    @timed("zotero.fetch_all", upstream="zotero")
     def fetch_all(self, force_refresh=False):
+        span = current_span()
         if not self.zot: 
             print("⚠️ Zotero client not initialized.")
             return []
@@ -77,6 +91,8 @@ class ZoteroSync:
                     cached = json.load(f)
                     if cached:
                         print(f"📖 Loaded {len(cached)} items from cache.")
+                        span.cache_hit = True
+                        span.attrs["items"] = len(cached)
                         return cached
             except:
                 pass
@@ -104,8 +120,10 @@ class ZoteroSync:
                 
                 if len(items) < limit: break
                 start += limit
-                time.sleep(0.5) 
+                time.sleep(self.page_delay) 
             
+            span.cache_hit = False
+            span.attrs["items"] = len(all_items)
             if all_items:
                 print(f"💾 Saving {len(all_items)} valid items to cache...")
                 with open(self.cache_file, 'w', encoding='utf-8') as f:
@@ -113,6 +131,7 @@ class ZoteroSync:
                 
             return all_items
         except Exception as e:
+            span.error = type(e).__name__
             print(f"❌ Zotero Sync Error: {e}")
             return all_items if all_items else []
 